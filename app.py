@@ -1,18 +1,77 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import gspread
 from google.oauth2.service_account import Credentials
+from PIL import Image, ImageOps
+from io import BytesIO
+import requests
+import hashlib
+import re
+import stat
+import tempfile
+import time
 import os
 
-# --- Page Config ---
-st.set_page_config(page_title="Neuropedia Clinical Directory", page_icon="NCD.ico", layout="wide")
-
 # --- Constants ---
-JSON_KEY_FILE = "ncnc-staff-directory-2cf1ef3956ba.json"
-SPREADSHEET_URL = "https://docs.google.com/spreadsheets/d/1UO1RRjt4d1JX7oU43k0PF8AhhTT5pQDhf0VXe4CW1Ws/edit?usp=sharing"
+# Resolved once so resources are found regardless of the launch directory
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+JSON_KEY_FILE = os.path.join(SCRIPT_DIR, "ncnc-staff-directory-2cf1ef3956ba.json")
+ICON_FILE = os.path.join(SCRIPT_DIR, "NCD.ico")
+SPREADSHEET_KEY = "1UO1RRjt4d1JX7oU43k0PF8AhhTT5pQDhf0VXe4CW1Ws"
+# No sheet name: the Sheets API reads this range from the first visible sheet
+DATA_RANGE = "A:ZZ"
+# Sheet data is reloaded once per CACHE_TTL-second window of wall-clock
+# time; the fragments force a full rerun once their frame's window is over
+CACHE_TTL = 600
+# Attempts at a sheet read when Google answers with a rate-limit or
+# transient server error; waits 1s, 2s, ... between attempts
+FETCH_ATTEMPTS = 4
+RETRY_STATUS = {429, 500, 503}
+# On-disk sheet snapshots, so a server restart within the same CACHE_TTL
+# window reuses the last load instead of calling the Sheets API again
+SNAPSHOT_DIR = os.path.join(tempfile.gettempdir(), "ncd")
+# Layout of the frames load_data builds. Bump it whenever the derived
+# columns change, so a deploy never reads back an older snapshot layout
+SNAPSHOT_SCHEMA = 1
+LOCATIONS = ["NPD", "NPS", "CDC"]
+# The only columns sent to the staff table; the rest (including Photo and
+# contact numbers) are shown in the details panel or not at all
+TABLE_COLS = ["Clinicians Name", "Role", "Location", "Email Address", "Days Available"]
+# Matches shown per table page; only the current page is sent to the browser
+PAGE_SIZE = 100
+# Bounding box clinician photos are scaled into before caching
+PHOTO_SIZE = (300, 300)
+# Cached photos are fetched again after PHOTO_TTL seconds, so a photo
+# replaced in place at the same URL shows up within the hour
+PHOTO_TTL = 3600
+# A photo that failed to load is retried after PHOTO_RETRY_TTL seconds;
+# until then its link isn't requested again
+PHOTO_RETRY_TTL = 300
+# Photos are fetched in the script thread, so a slow link blocks the panel
+PHOTO_TIMEOUT = 3
+# File id in Google Drive share links (/file/d/<id>/..., ?id=<id>)
+DRIVE_ID_RE = re.compile(r"drive\.google\.com/(?:file/d/|.*[?&]id=)([\w-]+)")
+# Columns matched case-insensitively by the free-text search filters
+SEARCH_COLS = ["Role", "Clinicians Name", "Days Available", "Specialty Areas", "Languages Spoken"]
+
+# --- Page Config ---
+st.set_page_config(page_title="Neuropedia Clinical Directory", page_icon=ICON_FILE, layout="wide")
 
 # --- Helper Functions ---
 
+def lc_col(col):
+    """
+    Name of the lowercased shadow column kept for a searchable column.
+    """
+    return f"_{col}_lc"
+
+def loc_col(loc):
+    """
+    Name of the boolean column flagging staff who work at a location.
+    """
+    return f"_at_{loc}"
+
 @st.cache_resource
 def connect_to_google_sheets():
     """
@@ -36,26 +95,242 @@ def connect_to_google_sheets():
         st.error(f"Connection Error: {e}")
         return None
 
-@st.cache_data(ttl=600)
-def load_data(_client, sheet_url):
+def snapshot_path(sheet_key):
     """
-    Loads data from the sheet into a Pandas DataFrame.
-    Cached for 600 seconds (10 mins) to prevent hitting Google API limits.
+    Path of the on-disk Parquet snapshot for a spreadsheet.
+    Uses a stable digest, as hash() is salted differently in every process.
+    """
+    digest = hashlib.sha1(sheet_key.encode()).hexdigest()[:16]
+    return os.path.join(SNAPSHOT_DIR, f"{digest}-v{SNAPSHOT_SCHEMA}.parquet")
+
+def snapshot_dir_is_private():
+    """
+    Whether SNAPSHOT_DIR is a real directory that only this user can access.
+    It sits in the shared temp dir, so another local user could have created
+    it first and planted snapshots there.
     """
     try:
-        sheet = _client.open_by_url(sheet_url).sheet1
-        data = sheet.get_all_records()
-        df = pd.DataFrame(data)
-        
-        # Clean data: Fill NaN with empty strings BEFORE converting to string
-        df = df.fillna("")
-        return df.astype(str)
-    except Exception as e:
-        st.error(f"Data Load Error: {e}")
+        info = os.lstat(SNAPSHOT_DIR)
+    except OSError:
+        return False
+    if not stat.S_ISDIR(info.st_mode):
+        return False
+    # No uids on Windows, where the temp dir is already per-user
+    if hasattr(os, "getuid"):
+        return info.st_uid == os.getuid() and not info.st_mode & 0o077
+    return True
+
+def read_snapshot(path, window):
+    """
+    Returns the snapshot at path if it was written in the current CACHE_TTL
+    window, else None.
+    """
+    if not snapshot_dir_is_private():
+        return None
+    try:
+        if int(os.path.getmtime(path) // CACHE_TTL) == window:
+            df = pd.read_parquet(path)
+            # Snapshots without a version digest can't be hashed by filter_mask
+            if "version" in df.attrs:
+                # Parquet brings strings back with python storage; restore Arrow
+                string_cols = df.select_dtypes("string").columns
+                return df.astype(dict.fromkeys(string_cols, "string[pyarrow]"))
+    except Exception:
+        pass
+    return None
+
+def write_snapshot(df, path):
+    """
+    Atomically writes df to path. Best effort: a failed write only means
+    the next cold start goes back to the Sheets API.
+    """
+    try:
+        os.makedirs(SNAPSHOT_DIR, mode=0o700, exist_ok=True)
+        # exist_ok leaves an existing directory's owner and mode as they are
+        if not snapshot_dir_is_private():
+            return
+        # mkstemp creates the file owner-only, as it holds staff contact data
+        fd, tmp_path = tempfile.mkstemp(dir=SNAPSHOT_DIR, suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "wb") as f:
+            df.to_parquet(f, compression="zstd")
+        os.replace(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+
+def fetch_columns(client, sheet_key):
+    """
+    Reads DATA_RANGE column-major from the sheet, retrying with exponential
+    backoff on quota (429) and transient server errors.
+    """
+    spreadsheet = None
+    for attempt in range(FETCH_ATTEMPTS):
+        try:
+            # Opened once; a retry only repeats the request that failed, so it
+            # doesn't spend an extra metadata call against the same quota
+            if spreadsheet is None:
+                spreadsheet = client.open_by_key(sheet_key)
+
+            # Read values off the spreadsheet directly; .sheet1 would cost an
+            # extra metadata round trip just to resolve the first worksheet.
+            # Column-major, so each list is one sheet column (header first)
+            # and pandas can take it as-is without transposing rows
+            response = spreadsheet.values_get(DATA_RANGE, params={"majorDimension": "COLUMNS"})
+            return response.get("values", [])
+        except gspread.exceptions.APIError as e:
+            if e.response.status_code not in RETRY_STATUS or attempt == FETCH_ATTEMPTS - 1:
+                raise
+            time.sleep(2 ** attempt)
+
+@st.cache_data(ttl=CACHE_TTL)
+def load_data(_client, sheet_key, window):
+    """
+    Loads data from the sheet into a Pandas DataFrame.
+    Cached per 600-second (10 min) window to prevent hitting Google API
+    limits, in memory and as a disk snapshot, so a restart skips the API
+    call too. window is int(time.time() // CACHE_TTL): as part of the cache
+    key it makes the memory copy and the snapshot expire together.
+    Errors are raised rather than returned, so a failed load isn't cached.
+    """
+    snapshot = snapshot_path(sheet_key)
+    df = read_snapshot(snapshot, window)
+    if df is not None:
+        return df
+
+    columns = fetch_columns(_client, sheet_key)
+    if not columns:
         return pd.DataFrame()
+    # Cells arrive as formatted strings, but the API trims trailing blanks
+    # from each column, so pad every column to the sheet's height with "".
+    # Arrow-backed strings let str.contains run in Arrow's C++ kernels.
+    n_rows = max(len(col) for col in columns) - 1
+    df = pd.DataFrame({
+        i: pd.array(col[1:] + [""] * (n_rows - len(col[1:])), dtype="string[pyarrow]")
+        for i, col in enumerate(columns)
+    })
+    df.columns = [col[0] if col else "" for col in columns]
+    # Content digest identifying this load; kept in the Parquet snapshot
+    df.attrs["version"] = hashlib.sha1(repr(columns).encode()).hexdigest()
 
-def apply_custom_css():
-    st.markdown("""
+    # Only a handful of age groups: as a categorical the filter compares
+    # integer codes, and the sorted uniques are kept in .cat.categories
+    if "Age Group Seen" in df.columns:
+        df["Age Group Seen"] = df["Age Group Seen"].astype("category")
+
+    # Lowercase each searchable column once per load, so filtering
+    # doesn't case-fold every row again on each rerun
+    for col in SEARCH_COLS:
+        if col in df.columns:
+            df[lc_col(col)] = df[col].str.lower()
+
+    # Whole-word location flags, so "NPD" can't match inside e.g. "NPDS"
+    # and a multi-site cell like "NPD, CDC" counts for both sites
+    if "Location" in df.columns:
+        for loc in LOCATIONS:
+            flags = df["Location"].str.contains(rf"\b{loc}\b", case=False)
+            df[loc_col(loc)] = flags.to_numpy(dtype=bool)
+
+    # Which rows carry a usable photo link, checked once per load
+    if "Photo" in df.columns:
+        df["Photo"] = df["Photo"].str.strip()
+        has_photo = df["Photo"].str.lower().str.startswith("http")
+        df["_has_photo"] = has_photo.to_numpy(dtype=bool)
+
+    write_snapshot(df, snapshot)
+    return df
+
+def refresh_data():
+    """
+    Drops both cached copies of the sheet (in memory and the disk snapshot)
+    and the cached photos, so the next rerun fetches fresh values from
+    Google Sheets and re-downloads any photo it shows.
+    """
+    load_data.clear()
+    fetch_photo.clear()
+    load_photo.clear()
+    try:
+        os.remove(snapshot_path(SPREADSHEET_KEY))
+    except OSError:
+        pass
+
+@st.cache_data(ttl=PHOTO_TTL, max_entries=256, show_spinner=False)
+def fetch_photo(photo_url):
+    """
+    Downloads a clinician photo and returns it as a WEBP thumbnail.
+    Cached so each photo is fetched and scaled once per PHOTO_TTL.
+    Failures raise instead of returning, so they are never cached.
+    """
+    # Drive share links point at the full-size original; its thumbnail
+    # endpoint serves a copy already scaled to the width we need
+    drive_id = DRIVE_ID_RE.search(photo_url)
+    if drive_id:
+        photo_url = f"https://drive.google.com/thumbnail?id={drive_id.group(1)}&sz=w{PHOTO_SIZE[0]}"
+    response = requests.get(photo_url, timeout=PHOTO_TIMEOUT)
+    response.raise_for_status()
+    img = Image.open(BytesIO(response.content))
+    # Re-encoding drops EXIF, so apply its orientation to the pixels first,
+    # or portrait phone photos come out rotated
+    img = ImageOps.exif_transpose(img)
+    # Leaves images already within PHOTO_SIZE untouched
+    img.thumbnail(PHOTO_SIZE)
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA")
+    buf = BytesIO()
+    img.save(buf, format="WEBP", quality=80)
+    return buf.getvalue()
+
+@st.cache_data(ttl=PHOTO_RETRY_TTL, max_entries=256, show_spinner=False)
+def load_photo(photo_url):
+    """
+    fetch_photo's thumbnail, or None if the photo can't be fetched or decoded.
+    Cached briefly so a dead or slow link costs one timeout per
+    PHOTO_RETRY_TTL, not one on every click on that clinician.
+    """
+    try:
+        return fetch_photo(photo_url)
+    except (OSError, Image.DecompressionBombError):
+        # Network errors, undecodable and oversized images land here
+        return None
+
+@st.cache_data(max_entries=64, show_spinner=False, hash_funcs={pd.DataFrame: lambda d: d.attrs["version"]})
+def filter_mask(df, locs, age, text_filters):
+    """
+    Boolean row mask for the given filters.
+    The frame is hashed by the digest load_data stores in its attrs, so the
+    cache key costs no more than hashing the filter values.
+    """
+    # Single pass: AND every active predicate into one mask, so the frame is
+    # indexed once instead of being re-sliced per filter.
+    # A plain numpy array keeps each &= a raw AND, with no index alignment.
+    mask = np.ones(len(df), dtype=bool)
+
+    if locs:
+        mask &= df[[loc_col(loc) for loc in locs]].any(axis=1).to_numpy(dtype=bool)
+    if age != "All":
+        mask &= (df["Age Group Seen"] == age).to_numpy(dtype=bool)
+
+    # The cheap bool/categorical predicates above run first; each substring
+    # search below then only scans the rows still in the running
+    for col, term in text_filters:
+        term = term.strip().lower()
+        if not term:
+            continue
+        rows = np.flatnonzero(mask)
+        if len(rows) == 0:
+            break
+        values = df[lc_col(col)]
+        if len(rows) < len(df):
+            values = values.iloc[rows]
+        # Plain substring match against the pre-lowercased column
+        mask[rows] = values.str.contains(term, regex=False, na=False).to_numpy(dtype=bool)
+
+    return mask
+
+# Built once at import; re-sent on full reruns only, as fragment reruns
+# leave it in place
+CUSTOM_CSS = """
         <style>
         /* 1. Main Background Color (Soft Gray) */
         .stApp { background-color: #f5f7fa !important; }
@@ -130,106 +405,48 @@ def apply_custom_css():
         }
         .specialty-box p { color: #333333 !important; }
         </style>
-    """, unsafe_allow_html=True)
-
-# --- Main App Layout ---
-def main():
-    apply_custom_css()
-    
-    # Always render footer
-    st.markdown("""
-        <div class="footer">
-            <p>Stephen/Khizar © 2025 - Neuropedia | Clinical Directory v2.4</p>
-        </div>
-    """, unsafe_allow_html=True)
-
-    st.title("Neuropedia Clinical Directory")
-
-    # 1. Initialize Connection (Cached Resource)
-    client = connect_to_google_sheets()
-    if not client: 
-        st.stop()
-    
-    # 2. Load Data (Cached Data)
-    df = load_data(client, SPREADSHEET_URL)
-    if df.empty: 
-        st.warning("No data found or connection failed.")
-        st.stop()
+    """
 
-    # ==========================================
-    # SECTION 1: SEARCH & FILTERS
-    # ==========================================
-    with st.expander("🔍 Search & Filters", expanded=True):
-        c1, c2, c3 = st.columns([1, 2, 2])
-        with c1:
-            loc_options = ["NPD", "NPS", "CDC"]
-            selected_locs = st.multiselect("Location", loc_options, placeholder="Select Location...")
-        with c2:
-            search_role = st.text_input("Role", placeholder="Search by role...")
-        with c3:
-            search_name = st.text_input("Name", placeholder="Search by name...")
-
-        c4, c5, c6, c7 = st.columns(4)
-        with c4:
-            # Get unique values safely, filtering out empty ones
-            valid_ages = [x for x in sorted(df["Age Group Seen"].unique()) if x]
-            age_options = ["All"] + valid_ages
-            search_age = st.selectbox("Age Group", age_options)
-        with c5:
-            search_days = st.text_input("Days Available", placeholder="Search days...")
-        with c6:
-            search_specialty = st.text_input("Specialty Areas", placeholder="Search specialty...")
-        with c7:
-            search_lang = st.text_input("Languages", placeholder="Search languages...")
+def apply_custom_css():
+    # A style-only st.html block is applied without adding a page element
+    st.html(CUSTOM_CSS)
 
-    # ==========================================
-    # SECTION 2: SECURITY & FILTER LOGIC
-    # ==========================================
-    
-    filters_applied = any([
-        len(selected_locs) > 0,
-        len(search_role.strip()) > 0,
-        len(search_name.strip()) > 0,
-        search_age != "All",
-        len(search_days.strip()) > 0,
-        len(search_specialty.strip()) > 0,
-        len(search_lang.strip()) > 0
-    ])
+def rerun_if_stale(window):
+    """
+    Fragment reruns reuse the frame passed in on the last full run. Once the
+    CACHE_TTL window it was loaded for has passed, rerun the whole app so
+    main() loads the sheet again.
+    """
+    if int(time.time() // CACHE_TTL) != window:
+        st.rerun(scope="app")
 
-    if not filters_applied:
-        st.info("👋 Please select a location or enter search criteria above to view the staff list.")
-        st.stop() 
-
-    # Apply filters
-    filtered_df = df.copy()
-
-    if selected_locs:
-        pattern = '|'.join(selected_locs)
-        filtered_df = filtered_df[filtered_df["Location"].str.contains(pattern, case=False, na=False)]
-    if search_role:
-        filtered_df = filtered_df[filtered_df["Role"].str.contains(search_role, case=False, na=False)]
-    if search_name:
-        filtered_df = filtered_df[filtered_df["Clinicians Name"].str.contains(search_name, case=False, na=False)]
-    if search_age and search_age != "All":
-        filtered_df = filtered_df[filtered_df["Age Group Seen"] == search_age]
-    if search_days:
-        filtered_df = filtered_df[filtered_df["Days Available"].str.contains(search_days, case=False, na=False)]
-    if search_specialty:
-        filtered_df = filtered_df[filtered_df["Specialty Areas"].str.contains(search_specialty, case=False, na=False)]
-    if search_lang:
-        filtered_df = filtered_df[filtered_df["Languages Spoken"].str.contains(search_lang, case=False, na=False)]
-
-    if filtered_df.empty:
-        st.warning("No matching staff found.")
-        st.stop()
+# --- Main App Layout ---
+@st.fragment
+def results_panel(df, match_rows, window):
+    """
+    Staff table and clinician details for the rows in match_rows.
+    A nested fragment, so selecting a row reruns only this part, not the
+    filter form and filter lookup in directory_panel().
+    """
+    rerun_if_stale(window)
 
     # ==========================================
     # SECTION 3: DATA TABLE
     # ==========================================
     st.markdown("### Staff List")
-    
-    sensitive_cols = ["Photo", "Contact Number", "Contact (Extn)"]
-    display_df = filtered_df.drop(columns=sensitive_cols, errors='ignore')
+
+    page = 1
+    page_count = (len(match_rows) - 1) // PAGE_SIZE + 1
+    if page_count > 1:
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1)
+    first = (page - 1) * PAGE_SIZE
+    page_rows = match_rows[first:first + PAGE_SIZE]
+    if page_count > 1:
+        st.caption(f"Showing {first + 1}-{first + len(page_rows)} of {len(match_rows)} matches")
+
+    # Slice the page's rows and the table columns in one step; only TABLE_COLS
+    # for the current page are copied and serialized to the browser
+    display_df = df.loc[df.index[page_rows], [col for col in TABLE_COLS if col in df.columns]]
     
     # Configure columns for better display
     column_config = {
@@ -256,19 +473,24 @@ def main():
     st.markdown("---") 
     st.subheader("Clinician Details")
 
-    if event.selection and event.selection.rows:
+    # A selection left over from another page or filter can be out of range
+    if event.selection and event.selection.rows and event.selection.rows[0] < len(page_rows):
         selected_index = event.selection.rows[0]
-        # Fetch row from filtered_df to get hidden columns (Photo, etc.)
-        row = filtered_df.iloc[selected_index]
+        # Map the page-local selection back to the full row in df, which
+        # also holds the hidden columns (Photo, etc.). A plain dict makes the
+        # field lookups below simple dict gets instead of Series indexing.
+        row = df.iloc[page_rows[selected_index]].to_dict()
 
         d_col1, d_col2, d_col3 = st.columns([1, 2, 2])
 
         with d_col1:
             st.markdown("**Photo**")
-            photo_url = row.get("Photo", "")
-            if photo_url and str(photo_url).strip().lower().startswith("http"):
+            photo = None
+            if row.get("_has_photo", False):
+                photo = load_photo(row["Photo"])
+            if photo:
                 # FIX 2: Removed use_container_width=True to use standard st.image sizing
-                st.image(photo_url) 
+                st.image(photo)
             else:
                 # Placeholder if no photo
                 st.markdown(
@@ -296,5 +518,112 @@ def main():
     else:
         st.info("👆 Select a clinician from the table above to view their details below.")
 
+@st.fragment
+def directory_panel(df, window):
+    """
+    Filters, staff table and clinician details.
+    Runs as a fragment, so applying filters reruns only this panel, not the
+    CSS, footer and data loading in main(). window is the CACHE_TTL window
+    df was loaded for.
+    """
+    rerun_if_stale(window)
+
+    # ==========================================
+    # SECTION 1: SEARCH & FILTERS
+    # ==========================================
+    with st.expander("🔍 Search & Filters", expanded=True):
+        # One form, so the inputs are applied together in a single rerun
+        with st.form("filters", border=False):
+            c1, c2, c3 = st.columns([1, 2, 2])
+            with c1:
+                selected_locs = st.multiselect("Location", LOCATIONS, placeholder="Select Location...")
+            with c2:
+                search_role = st.text_input("Role", placeholder="Search by role...")
+            with c3:
+                search_name = st.text_input("Name", placeholder="Search by name...")
+
+            c4, c5, c6, c7 = st.columns(4)
+            with c4:
+                # Categories are the sorted unique values; filter out empty ones
+                valid_ages = [x for x in df["Age Group Seen"].cat.categories if x]
+                age_options = ["All"] + valid_ages
+                search_age = st.selectbox("Age Group", age_options)
+            with c5:
+                search_days = st.text_input("Days Available", placeholder="Search days...")
+            with c6:
+                search_specialty = st.text_input("Specialty Areas", placeholder="Search specialty...")
+            with c7:
+                search_lang = st.text_input("Languages", placeholder="Search languages...")
+            st.form_submit_button("Apply Filters")
+
+    # ==========================================
+    # SECTION 2: SECURITY & FILTER LOGIC
+    # ==========================================
+    
+    filters_applied = any([
+        len(selected_locs) > 0,
+        len(search_role.strip()) > 0,
+        len(search_name.strip()) > 0,
+        search_age != "All",
+        len(search_days.strip()) > 0,
+        len(search_specialty.strip()) > 0,
+        len(search_lang.strip()) > 0
+    ])
+
+    if not filters_applied:
+        st.info("👋 Please select a location or enter search criteria above to view the staff list.")
+        return
+
+    text_filters = (
+        ("Role", search_role),
+        ("Clinicians Name", search_name),
+        ("Days Available", search_days),
+        ("Specialty Areas", search_specialty),
+        ("Languages Spoken", search_lang),
+    )
+    # Re-applying unchanged filters comes back from the cache
+    mask = filter_mask(df, tuple(selected_locs), search_age, text_filters)
+    # Positions of the matching staff in df, in table order
+    match_rows = np.flatnonzero(mask)
+
+    if len(match_rows) == 0:
+        st.warning("No matching staff found.")
+        return
+
+    results_panel(df, match_rows, window)
+
+def main():
+    apply_custom_css()
+    
+    # Always render footer
+    st.markdown("""
+        <div class="footer">
+            <p>Stephen/Khizar © 2025 - Neuropedia | Clinical Directory v2.4</p>
+        </div>
+    """, unsafe_allow_html=True)
+
+    st.title("Neuropedia Clinical Directory")
+    st.button("🔄 Refresh Data", on_click=refresh_data, help="Reload the directory and staff photos from Google Sheets")
+
+    # 1. Initialize Connection (Cached Resource)
+    client = connect_to_google_sheets()
+    if not client: 
+        st.stop()
+    
+    # 2. Load Data (Cached Data)
+    window = int(time.time() // CACHE_TTL)
+    try:
+        df = load_data(client, SPREADSHEET_KEY, window)
+    except Exception as e:
+        # Not cached, so the next rerun tries the sheet again
+        st.error(f"Data Load Error: {e}")
+        st.stop()
+    if df.empty: 
+        st.warning("No data found or connection failed.")
+        st.stop()
+
+    # 3. Filters, Table & Details (Fragment)
+    directory_panel(df, window)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file